@@ -1,31 +1,184 @@
-import random
+import argparse
+import sys
 import time
-from typing import List, Dict, Tuple
+from functools import cached_property
+from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
-from enum import Enum
-import matplotlib.pyplot as plt
+from enum import Enum, IntEnum
 import numpy as np
 
-class TransportMode(Enum):
-    WALKING = "walking"
-    PUBLIC_TRANSIT = "public_transit"
-    ICE_CAR = "ice_car"
-    EV_CAR = "ev_car"
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba is optional, hot paths then take their NumPy formulations
+    NUMBA_AVAILABLE = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# fastmath without ninf/nnan: reassociation and FMA contraction are allowed, but
+# comparisons against infinities and the affordability masks keep IEEE semantics
+_FASTMATH = {'reassoc', 'contract', 'arcp', 'nsz'}
+
+class TransportMode(IntEnum):
+    WALKING = 0
+    PUBLIC_TRANSIT = 1
+    ICE_CAR = 2
+    EV_CAR = 3
+    
+    @property
+    def key(self) -> str:
+        """Identifier used in history and reports, e.g. 'public_transit'"""
+        return self.name.lower()
+
+# Lookup from mode index back to TransportMode, avoids the enum constructor in loops
+MODE_ORDER = list(TransportMode)
+VEHICLE_TYPES = ["None", "ICE", "EV"]
+
+# Convenience score per mode, indexed by TransportMode
+MODE_CONVENIENCE = np.array([0.3, 0.6, 0.9, 0.95])
+# Modes a low income agent may pick regardless of cost
+LOW_INCOME_MODES = np.array([True, True, False, False])
+# Travel time utility reaches zero at 2 hours, stored as a reciprocal so kernels multiply
+INV_MAX_TRAVEL_TIME = 1.0 / 2.0
+
+# Preference columns in the agent arrays, with the range each is drawn from
+PREFERENCE_KEYS = ['cost_sensitivity', 'eco_friendliness', 'convenience', 'time_sensitivity']
+PREFERENCE_LOW = np.array([0.3, 0.1, 0.2, 0.4])
+PREFERENCE_HIGH = np.array([0.9, 0.7, 0.8, 0.9])
+
+# Every reason an agent can give for its monthly decision, stored in history as its index
+_MODE_LABELS = [mode.key.replace('_', ' ') for mode in TransportMode]
+DECISION_REASONS = (
+    [f"maintain {label} due to inertia" for label in _MODE_LABELS] +
+    [f"continue with {label}" for label in _MODE_LABELS] +
+    [f"switch to {label}" for label in _MODE_LABELS] +
+    ["sell ICE car and purchase EV", "sell EV and purchase ICE car",
+     "sell ICE car and switch to public transit", "sell EV car and switch to public transit",
+     "purchase EV car", "purchase ICE car"]
+)
+# Offsets into DECISION_REASONS, the first three blocks are indexed by TransportMode
+REASON_INERTIA = 0
+REASON_CONTINUE = 4
+REASON_SWITCH = 8
+REASON_SELL_ICE_FOR_EV = 12
+REASON_SELL_EV_FOR_ICE = 13
+REASON_SELL_ICE_FOR_TRANSIT = 14
+REASON_SELL_EV_FOR_TRANSIT = 15
+REASON_PURCHASE_EV = 16
+REASON_PURCHASE_ICE = 17
+
+# Decision history rows, grown in chunks of HISTORY_CHUNK months
+DECISION_DTYPE = np.dtype([('month', 'i4'), ('mode', 'i1'), ('reason', 'i2')])
+HISTORY_CHUNK = 128
+
+def reconsider_probability(months: np.ndarray) -> np.ndarray:
+    """Markov chain inertia: probability of reconsidering given months with current mode"""
+    return np.select([months <= 1, months <= 3, months <= 6], [0.8, 0.4, 0.2], default=0.1)
+
+def decision_reason_codes(reconsider: np.ndarray, old_mode: np.ndarray, new_mode: np.ndarray,
+                          old_vehicle: np.ndarray) -> np.ndarray:
+    """Reason code of every agent's decision, inertia where the agent did not reconsider
+    
+    A reconsidered mode is a continue, a vehicle sale or purchase, or a plain switch, checked in
+    that order. Vehicles are VEHICLE_TYPES indices: 0 none, 1 ICE, 2 EV.
+    """
+    old_mode = old_mode.astype(np.int16)
+    new_mode = new_mode.astype(np.int16)
+    to_transit = new_mode == TransportMode.PUBLIC_TRANSIT
+    purchase = np.where(new_mode == TransportMode.EV_CAR, REASON_PURCHASE_EV, REASON_PURCHASE_ICE)
+    codes = np.select(
+        [~reconsider,
+         new_mode == old_mode,
+         (new_mode == TransportMode.EV_CAR) & (old_vehicle == 1),
+         (new_mode == TransportMode.ICE_CAR) & (old_vehicle == 2),
+         to_transit & (old_vehicle == 1),
+         to_transit & (old_vehicle == 2),
+         (new_mode >= TransportMode.ICE_CAR) & (old_vehicle == 0)],
+        [REASON_INERTIA + old_mode,
+         REASON_CONTINUE + old_mode,
+         REASON_SELL_ICE_FOR_EV,
+         REASON_SELL_EV_FOR_ICE,
+         REASON_SELL_ICE_FOR_TRANSIT,
+         REASON_SELL_EV_FOR_TRANSIT,
+         purchase],
+        default=REASON_SWITCH + new_mode)
+    return codes.astype(np.int16)
+
+@njit(cache=True)
+def _mode_affordable(m, cost, budget, low_income):
+    """Whether mode m is available to an agent, shared by the batch kernel and Agent.can_afford_mode"""
+    if m == 0:  # Walking is always available
+        return True
+    if low_income:
+        return LOW_INCOME_MODES[m]
+    return cost <= budget or cost == 0
+
+@njit(cache=True, fastmath=_FASTMATH)
+def _mode_utility(prefs, inv_budget, m, cost_vec, emis_vec, time_vec, conv_vec, inv_emis_norm):
+    """Preference-weighted utility of mode m for one agent's preference row"""
+    # Weighted sum of multiplies only, which fastmath can fuse into FMAs
+    return (prefs[0] * max(0.0, 1.0 - (cost_vec[m] * inv_budget)) +
+            prefs[1] * max(0.0, 1.0 - (emis_vec[m] * inv_emis_norm)) +
+            prefs[2] * conv_vec[m] +
+            prefs[3] * max(0.0, 1.0 - (time_vec[m] * INV_MAX_TRAVEL_TIME)))
+
+@njit(cache=True, fastmath=_FASTMATH, parallel=True)
+def _decide_batch_kernel(prefs, budget, inv_budget, low_income, cost_vec, emis_vec, time_vec, conv_vec,
+                         inv_emis_norm):
+    """Best mode index for every agent, agents are independent so they are decided in parallel
+    
+    Written as a scalar loop over modes so no temporaries are allocated per agent.
+    """
+    n = budget.shape[0]
+    best = np.empty(n, dtype=np.int8)
+    for i in prange(n):
+        # Walking is always available, so it seeds the search and no sentinel is needed
+        best_mode = 0
+        best_utility = _mode_utility(prefs[i], inv_budget[i], 0,
+                                     cost_vec, emis_vec, time_vec, conv_vec, inv_emis_norm)
+        for m in range(1, 4):
+            if not _mode_affordable(m, cost_vec[m], budget[i], low_income[i]):
+                continue
+            utility = _mode_utility(prefs[i], inv_budget[i], m,
+                                    cost_vec, emis_vec, time_vec, conv_vec, inv_emis_norm)
+            if utility > best_utility:  # Strict, so the first maximum wins ties
+                best_mode = m
+                best_utility = utility
+        best[i] = best_mode
+    return best
 
 class IncomeLevel(Enum):
     LOW = "low"      # <$2,000/month
     MIDDLE = "middle" # $2,000-$5,000/month
     HIGH = "high"    # >$5,000/month
 
-@dataclass
+# Share of monthly income available for transport
+TRANSIT_BUDGET_SHARE = {
+    IncomeLevel.LOW: 0.15,     # 15% of income
+    IncomeLevel.MIDDLE: 0.25,  # 25% of income - allows EV adoption
+    IncomeLevel.HIGH: 0.35     # 35% of income
+}
+# Lookup from income index back to IncomeLevel, the agent arrays store the index
+INCOME_ORDER = list(IncomeLevel)
+
+@dataclass(frozen=True)
 class CarbonPricing:
     oil_price_per_barrel: float  # $/barrel
     carbon_price_per_gallon: float  # $/gallon
     
-    def calculate_gas_price_per_gallon(self) -> float:
-        """Calculate gas price per gallon including carbon pricing"""
+    @cached_property
+    def gas_price_per_gallon(self) -> float:
+        """Gas price per gallon including carbon pricing, computed once per instance"""
         base_price = self.oil_price_per_barrel / 42  # 1 barrel = 42 gallons
         return base_price + self.carbon_price_per_gallon
+    
+    def calculate_gas_price_per_gallon(self) -> float:
+        """Calculate gas price per gallon including carbon pricing"""
+        return self.gas_price_per_gallon
 
 @dataclass
 class TransportCosts:
@@ -41,6 +194,10 @@ class TransportCosts:
     public_transit_speed: float = 25.0  # 25 km/h (including stops)
     car_speed: float = 50.0  # 50 km/h (urban driving)
     
+    # Fixed monthly costs ($/month), after the original fields so positional construction is unchanged
+    ice_maintenance_per_month: float = 200.0  # Maintenance and insurance
+    ev_maintenance_per_month: float = 100.0  # Lower maintenance for EV
+    
     def get_ice_cost_per_km(self, gas_price_per_gallon: float) -> float:
         """Calculate ICE car cost per km including fuel"""
         fuel_cost = self.ice_fuel_consumption_l_per_km * gas_price_per_gallon / 3.785
@@ -50,15 +207,39 @@ class TransportCosts:
         """Calculate EV cost per km"""
         return (self.ev_consumption_wh_per_km / 1000) * self.electricity_cost_per_kwh
     
+    def _per_km_costs(self, gas_price_per_gallon: float) -> Tuple[float, float, float, float]:
+        """Distance-dependent cost per km of every mode, indexed by TransportMode"""
+        return (self.walking_cost_per_km, 0.0,  # Transit is charged per trip, see _fixed_costs
+                self.get_ice_cost_per_km(gas_price_per_gallon), self.get_ev_cost_per_km())
+    
+    def _fixed_costs(self) -> Tuple[float, float, float, float]:
+        """Fixed monthly cost of every mode, indexed by TransportMode"""
+        return (0.0,
+                self.public_transit_cost_per_trip * 2 * 30,  # Assume 2 trips per day
+                self.ice_maintenance_per_month,
+                self.ev_maintenance_per_month)
+    
+    def _speeds(self) -> Tuple[float, float, float, float]:
+        """Travel speed of every mode, indexed by TransportMode"""
+        return (self.walking_speed, self.public_transit_speed, self.car_speed, self.car_speed)
+    
+    def cost_vector(self, gas_price_per_gallon: float, daily_distance: float) -> np.ndarray:
+        """Monthly cost of every mode, indexed by TransportMode"""
+        monthly_distance = daily_distance * 30
+        return np.array(self._per_km_costs(gas_price_per_gallon)) * monthly_distance + np.array(self._fixed_costs())
+    
+    def get_mode_cost(self, mode: TransportMode, gas_price_per_gallon: float, daily_distance: float) -> float:
+        """Monthly cost of a single mode, same arithmetic as cost_vector without building arrays"""
+        monthly_distance = daily_distance * 30
+        return self._per_km_costs(gas_price_per_gallon)[mode] * monthly_distance + self._fixed_costs()[mode]
+    
+    def travel_time_vector(self, distance: float) -> np.ndarray:
+        """Travel time in hours of every mode for a given distance, indexed by TransportMode"""
+        return distance / np.array(self._speeds())
+    
     def get_travel_time(self, mode: TransportMode, distance: float) -> float:
         """Calculate travel time in hours for a given mode and distance"""
-        if mode == TransportMode.WALKING:
-            return distance / self.walking_speed
-        elif mode == TransportMode.PUBLIC_TRANSIT:
-            return distance / self.public_transit_speed
-        elif mode in [TransportMode.ICE_CAR, TransportMode.EV_CAR]:
-            return distance / self.car_speed
-        return 0.0
+        return distance / self._speeds()[mode]
 
 @dataclass
 class Emissions:
@@ -66,26 +247,42 @@ class Emissions:
     public_transit_g_co2_per_km: float = 50.0
     ice_g_co2_per_km: float = 200.0
     ev_g_co2_per_km: float = 50.0  # Based on California grid
+    
+    def _per_km(self) -> Tuple[float, float, float, float]:
+        """Emissions per km of every mode, indexed by TransportMode"""
+        return (self.walking_g_co2_per_km, self.public_transit_g_co2_per_km,
+                self.ice_g_co2_per_km, self.ev_g_co2_per_km)
+    
+    def emission_vector(self, daily_distance: float) -> np.ndarray:
+        """Monthly emissions of every mode, indexed by TransportMode"""
+        return np.array(self._per_km()) * (daily_distance * 30)
+    
+    def get_mode_emission(self, mode: TransportMode, daily_distance: float) -> float:
+        """Monthly emissions of a single mode without building arrays"""
+        return self._per_km()[mode] * (daily_distance * 30)
 
 class Agent:
-    def __init__(self, name: str, income_level: IncomeLevel, initial_mode: TransportMode):
+    # Fixed attribute layout: no per-instance __dict__ when scaling to many agents
+    __slots__ = ('name', '_rng', 'income_level', 'current_mode', 'preferences',
+                 'vehicle_owned', 'monthly_income', 'transit_budget', 'months_with_current_mode')
+    
+    def __init__(self, name: str, income_level: IncomeLevel, initial_mode: TransportMode,
+                 preferences: Optional[Dict[str, float]] = None,
+                 rng: Optional[np.random.Generator] = None):
         self.name = name
+        self._rng = rng if rng is not None else np.random.default_rng()
         self.income_level = income_level
         self.current_mode = initial_mode
-        self.preferences = self._generate_preferences()
+        self.preferences = preferences if preferences is not None else self._generate_preferences()
         self.vehicle_owned = self._get_initial_vehicle(initial_mode)
         self.monthly_income = self._get_income_range(income_level)
-        self.decision_history = []
+        self.transit_budget = TRANSIT_BUDGET_SHARE[income_level] * self.monthly_income  # Constant for the agent
         self.months_with_current_mode = 0  # For Markov chain inertia
-        
+        # Decision history is logged by the simulation's AgentSoA, see AgentView.decision_history
+    
     def _generate_preferences(self) -> Dict[str, float]:
         """Generate random preferences for convenience vs cost vs eco-friendliness"""
-        return {
-            'convenience': random.uniform(0.2, 0.8),
-            'cost_sensitivity': random.uniform(0.3, 0.9),
-            'eco_friendliness': random.uniform(0.1, 0.7),
-            'time_sensitivity': random.uniform(0.4, 0.9)  # New parameter for time sensitivity
-        }
+        return dict(zip(PREFERENCE_KEYS, self._rng.uniform(PREFERENCE_LOW, PREFERENCE_HIGH).tolist()))
     
     def _get_initial_vehicle(self, mode: TransportMode) -> str:
         if mode == TransportMode.ICE_CAR:
@@ -97,50 +294,27 @@ class Agent:
     
     def _get_income_range(self, level: IncomeLevel) -> float:
         if level == IncomeLevel.LOW:
-            return random.uniform(1000, 2000)
+            return self._rng.uniform(1000, 2000)
         elif level == IncomeLevel.MIDDLE:
-            return random.uniform(2000, 5000)
+            return self._rng.uniform(2000, 5000)
         else:  # HIGH
-            return random.uniform(5000, 10000)
+            return self._rng.uniform(5000, 10000)
     
     def get_transit_budget(self) -> float:
         """Get monthly transit budget based on income level"""
-        if self.income_level == IncomeLevel.LOW:
-            return self.monthly_income * 0.15  # 15% of income
-        elif self.income_level == IncomeLevel.MIDDLE:
-            return self.monthly_income * 0.25  # 25% of income - allows EV adoption
-        else:  # HIGH
-            return self.monthly_income * 0.35  # 35% of income
+        return self.transit_budget
     
     def calculate_mode_cost(self, mode: TransportMode, costs: TransportCosts, 
                           gas_price_per_gallon: float, daily_distance: float) -> float:
         """Calculate monthly cost for a transport mode"""
-        monthly_distance = daily_distance * 30
-        
-        if mode == TransportMode.WALKING:
-            return 0.0
-        elif mode == TransportMode.PUBLIC_TRANSIT:
-            # Assume 2 trips per day
-            return (costs.public_transit_cost_per_trip * 2 * 30)
-        elif mode == TransportMode.ICE_CAR:
-            fuel_cost = costs.get_ice_cost_per_km(gas_price_per_gallon) * monthly_distance
-            # Add maintenance and insurance
-            return fuel_cost + 200  # $200/month for maintenance/insurance
-        elif mode == TransportMode.EV_CAR:
-            electricity_cost = costs.get_ev_cost_per_km() * monthly_distance
-            # Add maintenance (lower for EV)
-            return electricity_cost + 100  # $100/month for maintenance/insurance
+        return costs.get_mode_cost(mode, gas_price_per_gallon, daily_distance)
     
     def can_afford_mode(self, mode: TransportMode, costs: TransportCosts, 
                        gas_price_per_gallon: float, daily_distance: float) -> bool:
-        """Check if agent can afford a transport mode"""
-        if self.income_level == IncomeLevel.LOW:
-            # Low income can only walk or use public transit
-            return mode in [TransportMode.WALKING, TransportMode.PUBLIC_TRANSIT]
-        
+        """Check if agent can afford a transport mode, same rule the decision kernel applies"""
         monthly_cost = self.calculate_mode_cost(mode, costs, gas_price_per_gallon, daily_distance)
-        transit_budget = self.get_transit_budget()
-        return monthly_cost <= transit_budget
+        return bool(_mode_affordable(int(mode), monthly_cost, self.transit_budget,
+                                     self.income_level == IncomeLevel.LOW))
     
     def can_switch_to_ev(self) -> bool:
         """Check if agent can afford to buy an EV"""
@@ -149,131 +323,163 @@ class Agent:
         # Middle and high income can afford EVs
         return self.monthly_income >= 2500
     
-    def should_reconsider_decision(self) -> bool:
-        """Markov chain: probability of reconsidering decision based on time with current mode"""
-        # Higher probability to change if recently switched, lower if long-term user
-        if self.months_with_current_mode <= 1:
-            return random.random() < 0.8  # 80% chance to reconsider if just switched
-        elif self.months_with_current_mode <= 3:
-            return random.random() < 0.4  # 40% chance after 1-3 months
-        elif self.months_with_current_mode <= 6:
-            return random.random() < 0.2  # 20% chance after 3-6 months
-        else:
-            return random.random() < 0.1  # 10% chance after 6+ months
-    
-    def make_decision(self, costs: TransportCosts, carbon_pricing: CarbonPricing, 
-                     emissions: Emissions, daily_distance: float) -> Tuple[TransportMode, str]:
-        """Agent makes transportation decision for the month using Markov chain approach"""
-        
-        # Check if agent should reconsider their decision (Markov chain)
-        if not self.should_reconsider_decision():
-            self.months_with_current_mode += 1
-            return self.current_mode, f"maintain {self.current_mode.value.replace('_', ' ')} due to inertia"
-        
-        gas_price = carbon_pricing.calculate_gas_price_per_gallon()
-        
-        # Calculate costs for all available modes
-        available_modes = []
-        for mode in TransportMode:
-            if self.can_afford_mode(mode, costs, gas_price, daily_distance):
-                available_modes.append(mode)
-        
-        if not available_modes:
-            # If can't afford any mode, default to walking
-            return TransportMode.WALKING, "Forced to walk due to affordability"
-        
-        # Calculate utility scores for each mode
-        mode_scores: Dict[TransportMode, float] = {}
-        for mode in available_modes:
-            cost = self.calculate_mode_cost(mode, costs, gas_price, daily_distance)
-            emission = self._get_emission_for_mode(mode, emissions, daily_distance)
-            travel_time = costs.get_travel_time(mode, daily_distance)
-            
-            # Utility function based on preferences
-            cost_utility = max(0, 1 - (cost / self.get_transit_budget()))  # Bounded utility
-            emission_utility = max(0, 1 - (emission / (emissions.ice_g_co2_per_km * daily_distance * 30)))
-            time_utility = max(0, 1 - (travel_time / 2.0))  # Normalize to 2 hours max
-            
-            # Weighted utility score
-            utility = (self.preferences['cost_sensitivity'] * cost_utility + 
-                      self.preferences['eco_friendliness'] * emission_utility + 
-                      self.preferences['convenience'] * self._get_convenience_score(mode) +
-                      self.preferences['time_sensitivity'] * time_utility)
-            
-            mode_scores[mode] = utility
-        
-        # Choose mode with highest utility
-        best_mode = max(mode_scores, key=lambda x: mode_scores[x])
-        
-        # Reset months counter if changing modes
-        if best_mode != self.current_mode:
-            self.months_with_current_mode = 0
-        else:
-            self.months_with_current_mode += 1
-        
-        # Check if agent wants to switch vehicles
-        decision_reason = self._get_decision_reason(best_mode, gas_price)
-        
-        return best_mode, decision_reason
-    
     def _get_emission_for_mode(self, mode: TransportMode, emissions: Emissions, daily_distance: float) -> float:
         """Calculate monthly emissions for a transport mode"""
-        monthly_distance = daily_distance * 30
-        
-        if mode == TransportMode.WALKING:
-            return emissions.walking_g_co2_per_km * monthly_distance
-        elif mode == TransportMode.PUBLIC_TRANSIT:
-            return emissions.public_transit_g_co2_per_km * monthly_distance
-        elif mode == TransportMode.ICE_CAR:
-            return emissions.ice_g_co2_per_km * monthly_distance
-        elif mode == TransportMode.EV_CAR:
-            return emissions.ev_g_co2_per_km * monthly_distance
-        return 0
+        return emissions.get_mode_emission(mode, daily_distance)
     
     def _get_convenience_score(self, mode: TransportMode) -> float:
         """Get convenience score for transport mode"""
-        if mode == TransportMode.WALKING:
-            return 0.3
-        elif mode == TransportMode.PUBLIC_TRANSIT:
-            return 0.6
-        elif mode == TransportMode.ICE_CAR:
-            return 0.9
-        elif mode == TransportMode.EV_CAR:
-            return 0.95
-        return 0
+        return float(MODE_CONVENIENCE[mode])
+
+class AgentSoA:
+    """Agent state as contiguous per-field arrays, row i belongs to agent i
     
-    def _get_decision_reason(self, new_mode: TransportMode, gas_price: float) -> str:
-        """Generate decision reason based on mode change"""
-        if new_mode == self.current_mode:
-            return f"continue with {self.current_mode.value.replace('_', ' ')}"
-        
-        if new_mode == TransportMode.EV_CAR and self.vehicle_owned == "ICE":
-            return f"sell ICE car and purchase EV"
-        elif new_mode == TransportMode.ICE_CAR and self.vehicle_owned == "EV":
-            return f"sell EV and purchase ICE car"
-        elif new_mode == TransportMode.PUBLIC_TRANSIT and self.vehicle_owned in ["ICE", "EV"]:
-            return f"sell {self.vehicle_owned} car and switch to public transit"
-        elif new_mode in [TransportMode.ICE_CAR, TransportMode.EV_CAR] and self.vehicle_owned == "None":
-            vehicle_type = "EV" if new_mode == TransportMode.EV_CAR else "ICE"
-            return f"purchase {vehicle_type} car"
-        else:
-            return f"switch to {new_mode.value.replace('_', ' ')}"
+    The only live copy of the simulation's agent state: Agent objects seed it, AgentView reads it.
+    """
+    __slots__ = ('names', 'income_level', 'income', 'prefs', 'mode', 'vehicle', 'months', 'budget',
+                 'inv_budget', 'low_income', 'first_month', '_mode_log', '_reason_log', '_log_len')
+    
+    def __init__(self, agents: List[Agent], first_month: int = 1):
+        self.names = [a.name for a in agents]  # Only read by reports, so kept as a list
+        self.income_level = np.array([INCOME_ORDER.index(a.income_level) for a in agents], dtype=np.int8)
+        self.income = np.array([a.monthly_income for a in agents], dtype=np.float64)
+        # Columns follow PREFERENCE_KEYS: cost, eco, convenience, time
+        self.prefs = np.array([[a.preferences[key] for key in PREFERENCE_KEYS] for a in agents],
+                              dtype=np.float64).reshape(len(agents), 4)
+        self.mode = np.array([a.current_mode for a in agents], dtype=np.int8)
+        self.vehicle = np.array([VEHICLE_TYPES.index(a.vehicle_owned) for a in agents], dtype=np.int8)
+        self.months = np.array([a.months_with_current_mode for a in agents], dtype=np.int32)
+        self.budget = np.array([a.transit_budget for a in agents], dtype=np.float64)
+        self.inv_budget = 1.0 / self.budget  # Budgets are constant, so divide once
+        self.low_income = np.array([a.income_level == IncomeLevel.LOW for a in agents], dtype=bool)
+        # Decision log in blocks of HISTORY_CHUNK months, rows by month and columns by agent.
+        # Full blocks are kept and a new one appended, so logged rows are never copied.
+        self.first_month = first_month  # Simulation month of the first logged row
+        self._mode_log = []
+        self._reason_log = []
+        self._log_len = 0
+    
+    def __len__(self) -> int:
+        return len(self.budget)
+    
+    def record_decisions(self, modes: np.ndarray, reasons: np.ndarray):
+        """Log one month of decisions for every agent, reasons are DECISION_REASONS indices"""
+        row = self._log_len % HISTORY_CHUNK
+        if row == 0:
+            n_agents = len(self)
+            self._mode_log.append(np.empty((HISTORY_CHUNK, n_agents), dtype=np.int8))
+            self._reason_log.append(np.empty((HISTORY_CHUNK, n_agents), dtype=np.int16))
+        self._mode_log[-1][row] = modes
+        self._reason_log[-1][row] = reasons
+        self._log_len += 1
+    
+    def decision_history(self, i: int) -> np.ndarray:
+        """Logged decisions of agent i as DECISION_DTYPE rows, built on request"""
+        n_months = self._log_len
+        history = np.empty(n_months, dtype=DECISION_DTYPE)
+        history['month'] = np.arange(self.first_month, self.first_month + n_months)
+        if n_months:
+            history['mode'] = np.concatenate([block[:, i] for block in self._mode_log])[:n_months]
+            history['reason'] = np.concatenate([block[:, i] for block in self._reason_log])[:n_months]
+        return history
+    
+    def view(self, i: int) -> 'AgentView':
+        """Read-only proxy onto agent i, for reporting and inspection"""
+        return AgentView(self, i)
+
+class AgentView:
+    """Agent-like accessors over one row of an AgentSoA, nothing is copied
+    
+    Read-only: the properties have no setters, so writes raise AttributeError instead of being lost.
+    """
+    __slots__ = ('_soa', '_index')
+    
+    def __init__(self, soa: AgentSoA, index: int):
+        self._soa = soa
+        self._index = index
+    
+    @property
+    def name(self) -> str:
+        return self._soa.names[self._index]
+    
+    @property
+    def income_level(self) -> IncomeLevel:
+        return INCOME_ORDER[self._soa.income_level[self._index]]
+    
+    @property
+    def current_mode(self) -> TransportMode:
+        return MODE_ORDER[self._soa.mode[self._index]]
+    
+    @property
+    def vehicle_owned(self) -> str:
+        return VEHICLE_TYPES[self._soa.vehicle[self._index]]
+    
+    @property
+    def months_with_current_mode(self) -> int:
+        return int(self._soa.months[self._index])
+    
+    @property
+    def monthly_income(self) -> float:
+        return float(self._soa.income[self._index])
+    
+    @property
+    def transit_budget(self) -> float:
+        return float(self._soa.budget[self._index])
+    
+    @property
+    def preferences(self) -> Dict[str, float]:
+        return dict(zip(PREFERENCE_KEYS, self._soa.prefs[self._index].tolist()))
+    
+    @property
+    def decision_history(self) -> np.ndarray:
+        return self._soa.decision_history(self._index)
 
 class CarbonPricingSimulation:
-    def __init__(self):
-        self.agents = []
+    def __init__(self, verbose: bool = False, seed: Optional[int] = None):
+        self.verbose = verbose  # Print the per-agent monthly report
+        self.rng = np.random.default_rng(seed)  # Single source of randomness, shared with agents
         self.costs = TransportCosts()
         self.emissions = Emissions()
         self.month = 0
-        self.history = {
-            'mode_shares': [],
-            'total_emissions': [],
-            'ev_adoption_rate': [],
-            'gas_prices': []
+        self._agent_arrays = AgentSoA(self._initialize_agents())
+        # Monthly statistics, preallocated and grown in chunks of HISTORY_CHUNK months
+        self._history_arrays = {
+            'mode_shares': np.empty((HISTORY_CHUNK, 4)),  # Percent per mode, columns by TransportMode
+            'total_emissions': np.empty(HISTORY_CHUNK),
+            'ev_adoption_rate': np.empty(HISTORY_CHUNK),
+            'gas_prices': np.empty(HISTORY_CHUNK)
         }
-        self._initialize_agents()
     
-    def _initialize_agents(self):
+    @property
+    def agents(self) -> List[AgentView]:
+        """Live read-only views onto the agent arrays, which own all agent state"""
+        arrays = self._agent_arrays
+        return [arrays.view(i) for i in range(len(arrays))]
+    
+    @agents.setter
+    def agents(self, agents: List[Agent]):
+        """Replace the population, the Agent objects seed fresh arrays and a fresh decision log"""
+        self._agent_arrays = AgentSoA(list(agents), first_month=self.month + 1)
+    
+    @property
+    def history(self) -> Dict[str, np.ndarray]:
+        """Recorded statistics, one row per simulated month"""
+        return {key: values[:self.month] for key, values in self._history_arrays.items()}
+    
+    def _record_history(self, mode_shares: np.ndarray, total_emissions: float,
+                        ev_adoption_rate: float, gas_price: float):
+        """Store this month's statistics, growing the history arrays when full"""
+        row = self.month - 1
+        if row == len(self._history_arrays['gas_prices']):
+            for key, values in self._history_arrays.items():
+                chunk = np.empty((HISTORY_CHUNK,) + values.shape[1:], dtype=values.dtype)
+                self._history_arrays[key] = np.concatenate([values, chunk])
+        self._history_arrays['mode_shares'][row] = mode_shares
+        self._history_arrays['total_emissions'][row] = total_emissions
+        self._history_arrays['ev_adoption_rate'][row] = ev_adoption_rate
+        self._history_arrays['gas_prices'][row] = gas_price
+    
+    def _initialize_agents(self) -> List[Agent]:
         """Initialize 10 agents with different characteristics using ABC names"""
         names = ['Abigail', 'Bob', 'Carl', 'Diana', 'Eve', 'Frank', 'Grace', 'Henry', 'Ivy', 'Jack']
         
@@ -299,86 +505,141 @@ class CarbonPricingSimulation:
             TransportMode.EV_CAR           # Jack - high income, EV car
         ]
         
+        # Draw every agent's preferences in one batch, columns follow PREFERENCE_KEYS
+        prefs = self.rng.uniform(PREFERENCE_LOW, PREFERENCE_HIGH, size=(len(names), 4))
+        
+        agents = []
         for i, name in enumerate(names):
-            agent = Agent(name, income_levels[i], initial_modes[i])
-            self.agents.append(agent)
+            preferences = dict(zip(PREFERENCE_KEYS, prefs[i].tolist()))
+            agent = Agent(name, income_levels[i], initial_modes[i], preferences, rng=self.rng)
+            agents.append(agent)
+        return agents
+    
+    def _best_modes_numpy(self, cost_vec: np.ndarray, emis_vec: np.ndarray,
+                          time_vec: np.ndarray, inv_emis_norm: float) -> np.ndarray:
+        """_decide_batch_kernel as (N, 4) array operations, used when numba is not installed
+        
+        Vectorized form of _mode_affordable and _mode_utility, argmax keeps the kernel's
+        first-maximum tie break.
+        """
+        arrays = self._agent_arrays
+        
+        cost_matrix = np.broadcast_to(cost_vec, (len(arrays), 4))
+        affordable = (cost_matrix <= arrays.budget[:, None]) | (cost_vec == 0)
+        afford_mask = np.where(arrays.low_income[:, None], LOW_INCOME_MODES, affordable)
+        afford_mask[:, TransportMode.WALKING] = True
+        
+        # Utility function based on preferences, shape (N, 4)
+        cost_utility = np.maximum(0, 1 - (cost_matrix * arrays.inv_budget[:, None]))
+        emission_utility = np.maximum(0, 1 - (emis_vec * inv_emis_norm))
+        time_utility = np.maximum(0, 1 - (time_vec * INV_MAX_TRAVEL_TIME))
+        prefs = arrays.prefs
+        utility = (prefs[:, 0:1] * cost_utility +
+                   prefs[:, 1:2] * emission_utility +
+                   prefs[:, 2:3] * MODE_CONVENIENCE +
+                   prefs[:, 3:4] * time_utility)
+        
+        # No fastmath here, so -inf is a safe mask for unaffordable modes
+        return np.argmax(np.where(afford_mask, utility, -np.inf), axis=1).astype(np.int8)
+    
+    def _decide_all(self, reconsider: np.ndarray, cost_vec: np.ndarray, emis_vec: np.ndarray,
+                    time_vec: np.ndarray, inv_emis_norm: float) -> np.ndarray:
+        """Pick the highest-utility affordable mode for every agent and update the agent arrays"""
+        arrays = self._agent_arrays
+        if NUMBA_AVAILABLE:
+            best = _decide_batch_kernel(arrays.prefs, arrays.budget, arrays.inv_budget, arrays.low_income,
+                                        cost_vec, emis_vec, time_vec, MODE_CONVENIENCE, inv_emis_norm)
+        else:
+            # The shimmed kernel would loop in Python, the (N, 4) formulation stays vectorized
+            best = self._best_modes_numpy(cost_vec, emis_vec, time_vec, inv_emis_norm)
+        new_mode = np.where(reconsider, best, arrays.mode)
+        
+        # Reset months counter when changing modes, otherwise accumulate inertia
+        changed = new_mode != arrays.mode
+        arrays.months = np.where(changed, 0, arrays.months + 1).astype(np.int32)
+        arrays.vehicle = np.where(new_mode == TransportMode.EV_CAR, 2,
+                                  np.where(new_mode == TransportMode.ICE_CAR, 1, 0)).astype(np.int8)
+        arrays.mode = new_mode
+        return new_mode
     
     def run_month(self, carbon_pricing: CarbonPricing, daily_distance: float = 17.0):
         """Run simulation for one month"""
         self.month += 1
         gas_price = carbon_pricing.calculate_gas_price_per_gallon()
         
-        print(f"\n=== MONTH {self.month} ===")
-        print(f"Gas price: ${gas_price:.2f}/gallon (Oil: ${carbon_pricing.oil_price_per_barrel}/barrel, Carbon: ${carbon_pricing.carbon_price_per_gallon}/gallon)")
+        lines = []
+        if self.verbose:
+            lines.append(f"\n=== MONTH {self.month} ===")
+            lines.append(f"Gas price: ${gas_price:.2f}/gallon (Oil: ${carbon_pricing.oil_price_per_barrel}/barrel, Carbon: ${carbon_pricing.carbon_price_per_gallon}/gallon)")
         
         # Agents make decisions
-        total_emissions = 0
-        mode_counts = {mode: 0 for mode in TransportMode}
-        ev_count = 0
+        # Markov chain inertia: one batched draw for every agent
+        arrays = self._agent_arrays
+        u = self.rng.random(len(arrays))
+        reconsider = u < reconsider_probability(arrays.months)
+        # Per-mode cost, emissions and travel time are identical for every agent
+        cost_vec = self.costs.cost_vector(gas_price, daily_distance)
+        emis_vec = self.emissions.emission_vector(daily_distance)
+        time_vec = self.costs.travel_time_vector(daily_distance)
+        # Emissions are normalized against an ICE car covering the month's distance
+        monthly_distance = daily_distance * 30
+        inv_emis_norm = 1.0 / (self.emissions.ice_g_co2_per_km * monthly_distance)
+        # _decide_all rebinds the mode and vehicle arrays, these keep last month's state
+        old_modes, old_vehicles = arrays.mode, arrays.vehicle
+        new_modes = self._decide_all(reconsider, cost_vec, emis_vec, time_vec, inv_emis_norm)
+        reasons = decision_reason_codes(reconsider, old_modes, new_modes, old_vehicles)
+        arrays.record_decisions(new_modes, reasons)
         
-        for agent in self.agents:
-            new_mode, reason = agent.make_decision(self.costs, carbon_pricing, self.emissions, daily_distance)
-            
-            # Update agent's mode and vehicle
-            if new_mode in [TransportMode.ICE_CAR, TransportMode.EV_CAR]:
-                agent.vehicle_owned = "EV" if new_mode == TransportMode.EV_CAR else "ICE"
-            else:
-                agent.vehicle_owned = "None"
-            
-            agent.current_mode = new_mode
-            agent.decision_history.append((self.month, new_mode, reason))
-            
-            # Count modes and calculate emissions
-            mode_counts[new_mode] += 1
-            if new_mode == TransportMode.EV_CAR:
-                ev_count += 1
-            
-            monthly_emissions = agent._get_emission_for_mode(new_mode, self.emissions, daily_distance)
-            total_emissions += monthly_emissions
-            
-            # Calculate travel time for this agent
-            travel_time = self.costs.get_travel_time(new_mode, daily_distance)
-            monthly_cost = agent.calculate_mode_cost(new_mode, self.costs, gas_price, daily_distance)
-            
-            print(f"{agent.name} ({agent.income_level.value}, ${agent.monthly_income:.0f}/month, budget: ${agent.get_transit_budget():.0f}) decides to {reason}")
-            print(f"  → Cost: ${monthly_cost:.0f}/month, Travel time: {travel_time:.1f}h/day, Emissions: {monthly_emissions/1000:.1f}kg CO2/month")
+        # Per-agent emissions, reused for the total and the breakdown by mode
+        emis_arr = emis_vec[new_modes]
+        total_emissions = float(emis_arr.sum())
         
-        # Calculate and display statistics
-        total_agents = len(self.agents)
-        mode_shares = {mode.value: (count/total_agents)*100 for mode, count in mode_counts.items()}
-        ev_adoption_rate = (ev_count / total_agents) * 100
+        if self.verbose:
+            # Strings are only built for the report, the decisions themselves stay in arrays
+            for agent, mode, reason in zip(self.agents, new_modes.tolist(), reasons.tolist()):
+                lines.append(f"{agent.name} ({agent.income_level.value}, ${agent.monthly_income:.0f}/month, budget: ${agent.transit_budget:.0f}) decides to {DECISION_REASONS[reason]}")
+                lines.append(f"  → Cost: ${cost_vec[mode]:.0f}/month, Travel time: {time_vec[mode]:.1f}h/day, Emissions: {emis_vec[mode]/1000:.1f}kg CO2/month")
         
-        print(f"\n--- STATISTICS ---")
-        print(f"Mode shares:")
-        for mode, share in mode_shares.items():
-            print(f"  {mode.replace('_', ' ')}: {share:.1f}%")
-        print(f"EV adoption rate: {ev_adoption_rate:.1f}%")
-        print(f"Total monthly emissions: {total_emissions/1000:.1f} kg CO2")
+        # Calculate and display statistics
+        total_agents = len(arrays)
+        mode_counts = np.bincount(new_modes, minlength=4)
+        mode_shares = (mode_counts / total_agents) * 100
+        ev_adoption_rate = (int(mode_counts[TransportMode.EV_CAR]) / total_agents) * 100
         
-        # Breakdown of emissions by mode
-        print(f"Emissions breakdown:")
-        for mode in TransportMode:
-            mode_agents = [a for a in self.agents if a.current_mode == mode]
-            mode_emissions = sum(a._get_emission_for_mode(mode, self.emissions, daily_distance) for a in mode_agents)
-            if mode_emissions > 0:
-                print(f"  {mode.value.replace('_', ' ')}: {mode_emissions/1000:.1f} kg CO2 ({mode_emissions/total_emissions*100:.1f}%)")
+        if self.verbose:
+            lines.append(f"\n--- STATISTICS ---")
+            lines.append(f"Mode shares:")
+            for mode in TransportMode:
+                lines.append(f"  {mode.key.replace('_', ' ')}: {mode_shares[mode]:.1f}%")
+            lines.append(f"EV adoption rate: {ev_adoption_rate:.1f}%")
+            lines.append(f"Total monthly emissions: {total_emissions/1000:.1f} kg CO2")
+            
+            # Breakdown of emissions by mode, grouped in a single pass over the agents
+            per_mode = np.bincount(new_modes, weights=emis_arr, minlength=4)
+            lines.append(f"Emissions breakdown:")
+            for mode in TransportMode:
+                mode_emissions = per_mode[mode]
+                if mode_emissions > 0:
+                    lines.append(f"  {mode.key.replace('_', ' ')}: {mode_emissions/1000:.1f} kg CO2 ({mode_emissions/total_emissions*100:.1f}%)")
+            
+            # One write for the whole month instead of a print per line
+            sys.stdout.write("\n".join(lines) + "\n")
         
         # Store history
-        self.history['mode_shares'].append(mode_shares)
-        self.history['total_emissions'].append(total_emissions/1000)  # Convert to kg
-        self.history['ev_adoption_rate'].append(ev_adoption_rate)
-        self.history['gas_prices'].append(gas_price)
+        self._record_history(mode_shares, total_emissions/1000, ev_adoption_rate, gas_price)  # Emissions in kg
     
     def plot_trends(self):
         """Plot trends over time"""
-        months = list(range(1, self.month + 1))
+        import matplotlib.pyplot as plt  # Imported on first plot, headless runs never load matplotlib
+        
+        months = np.arange(1, self.month + 1)
         
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
         
         # Mode shares over time
+        history = self.history
         for mode in TransportMode:
-            shares = [month_data[mode.value] for month_data in self.history['mode_shares']]
-            ax1.plot(months, shares, label=mode.value.replace('_', ' '), marker='o')
+            ax1.plot(months, history['mode_shares'][:, mode], label=mode.key.replace('_', ' '), marker='o')
         ax1.set_title('Mode Shares Over Time')
         ax1.set_xlabel('Month')
         ax1.set_ylabel('Share (%)')
@@ -386,21 +647,21 @@ class CarbonPricingSimulation:
         ax1.grid(True)
         
         # Total emissions over time
-        ax2.plot(months, self.history['total_emissions'], marker='o', color='red')
+        ax2.plot(months, history['total_emissions'], marker='o', color='red')
         ax2.set_title('Total Monthly Emissions')
         ax2.set_xlabel('Month')
         ax2.set_ylabel('Emissions (kg CO2)')
         ax2.grid(True)
         
         # EV adoption rate over time
-        ax3.plot(months, self.history['ev_adoption_rate'], marker='o', color='green')
+        ax3.plot(months, history['ev_adoption_rate'], marker='o', color='green')
         ax3.set_title('EV Adoption Rate')
         ax3.set_xlabel('Month')
         ax3.set_ylabel('EV Adoption Rate (%)')
         ax3.grid(True)
         
         # Gas prices over time
-        ax4.plot(months, self.history['gas_prices'], marker='o', color='orange')
+        ax4.plot(months, history['gas_prices'], marker='o', color='orange')
         ax4.set_title('Gas Prices Over Time')
         ax4.set_xlabel('Month')
         ax4.set_ylabel('Gas Price ($/gallon)')
@@ -408,15 +669,16 @@ class CarbonPricingSimulation:
         
         plt.tight_layout()
         plt.show()
+        plt.close(fig)  # Release the figure so repeated plots don't accumulate handles
 
-def main():
-    """Main simulation function"""
+def main(plot: bool = True):
+    """Main simulation function, plot=False never touches matplotlib"""
     print("=== CARBON PRICING SIMULATION ===")
     print("Small town transportation decision simulation with 10 agents")
     print("Agents make monthly decisions based on costs, preferences, and carbon pricing")
     
     # Initialize simulation
-    sim = CarbonPricingSimulation()
+    sim = CarbonPricingSimulation(verbose=True)
     
     # Get user input for carbon pricing
     print("\nEnter simulation parameters:")
@@ -433,6 +695,9 @@ def main():
     print(f"Carbon price: ${carbon_price_per_gallon}/gallon")
     print(f"Gas price: ${carbon_pricing.calculate_gas_price_per_gallon():.2f}/gallon")
     
+    # Plotting is only offered when it is enabled, otherwise 'p' is not a choice
+    continue_prompt = "\nContinue simulation? (y/n/p for plot): " if plot else "\nContinue simulation? (y/n): "
+    
     # Run simulation
     month = 0
     while True:
@@ -443,16 +708,16 @@ def main():
             if month % 3 == 0:  # Every 3 months, show trends
                 print(f"\n{'='*50}")
                 print(f"TREND SUMMARY (Month {month})")
-                print(f"Total emissions trend: {sim.history['total_emissions'][-3:]}")
-                print(f"EV adoption trend: {sim.history['ev_adoption_rate'][-3:]}")
+                print(f"Total emissions trend: {sim.history['total_emissions'][-3:].tolist()}")
+                print(f"EV adoption trend: {sim.history['ev_adoption_rate'][-3:].tolist()}")
                 print(f"{'='*50}")
             
             # Ask user if they want to continue
             if month % 6 == 0:  # Every 6 months
-                response = input(f"\nContinue simulation? (y/n/p for plot): ").lower()
+                response = input(continue_prompt).lower()
                 if response == 'n':
                     break
-                elif response == 'p':
+                elif response == 'p' and plot:
                     sim.plot_trends()
                     continue_response = input("Continue simulation? (y/n): ").lower()
                     if continue_response == 'n':
@@ -461,13 +726,16 @@ def main():
         except KeyboardInterrupt:
             print("\nSimulation paused. Options:")
             print("1. Continue (press Enter)")
-            print("2. Show trends (type 'p')")
-            print("3. Exit (type 'n')")
+            if plot:
+                print("2. Show trends (type 'p')")
+                print("3. Exit (type 'n')")
+            else:
+                print("2. Exit (type 'n')")
             
             response = input("Choice: ").lower()
             if response == 'n':
                 break
-            elif response == 'p':
+            elif response == 'p' and plot:
                 sim.plot_trends()
     
     # Final summary
@@ -482,7 +750,7 @@ def main():
     # Show final mode distribution
     final_modes = {}
     for agent in sim.agents:
-        mode = agent.current_mode.value
+        mode = agent.current_mode.key
         final_modes[mode] = final_modes.get(mode, 0) + 1
     
     print(f"\nFinal mode distribution:")
@@ -490,7 +758,11 @@ def main():
         print(f"  {mode.replace('_', ' ')}: {count} agents")
     
     # Plot final trends
-    sim.plot_trends()
+    if plot:
+        sim.plot_trends()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Carbon pricing transportation simulation")
+    parser.add_argument('--no-plot', action='store_true',
+                        help="never import matplotlib, for batch and headless runs")
+    main(plot=not parser.parse_args().no_plot)